@@ -0,0 +1,25 @@
+"""
+Hyperparameters shared by the particle swarm implementations
+Kept free of heavy imports so the optional JAX and CUDA backends can use them
+"""
+
+import typing
+import numpy as np
+
+
+# Values set based on Clerc and Kennedy, more info here: 
+# https://towardsdatascience.com/particle-swarm-optimization-visually-explained-46289eeb2e14
+INERTIA = 0.8
+# When the length of the search is known, inertia instead decays linearly from start
+# to end over it, based on Shi and Eberhart
+INERTIA_START = 0.9
+INERTIA_END = 0.4
+COGNITIVE_COEFFICIENT = 2.05
+SOCIAL_COEFFICIENT = 2.05
+
+
+def inertia_schedule(step: typing.Union[int, np.ndarray], n_iterations: int,
+                     inertia_start: float = INERTIA_START,
+                     inertia_end: float = INERTIA_END) -> typing.Union[float, np.ndarray]:
+    """Inertia at step(s) 1..n_iterations of a search, decaying linearly from start to end"""
+    return inertia_end + (n_iterations - step) / n_iterations * (inertia_start - inertia_end)
@@ -14,25 +14,77 @@ if __name__ == '__main__':
         '--iterations', default=20, type=int, help='The number of iterations to find solution')
     parser.add_argument(
         '--plot', default=False, type=bool, action=argparse.BooleanOptionalAction,
-        help='''Whether or not to produce display plots. Plots will be stored in the tmp/ directory. 
+        help='''Whether or not to produce display plots. An animation will be stored in the tmp/ directory. 
         This will slow down the program immensely.''')
     parser.add_argument(
         '--seed', default=None, type=int, help='Value to seed the random number generator with')
+    parser.add_argument(
+        '--constriction', default=False, type=bool, action=argparse.BooleanOptionalAction,
+        help='''Use the constriction factor velocity update instead of a decaying inertia 
+        (numpy backend only)''')
+    parser.add_argument(
+        '--processes', default=None, type=int,
+        help='''Number of worker processes used to evaluate the cost function (numpy backend only). 
+        Only worthwhile for expensive cost functions.''')
+    parser.add_argument(
+        '--kernel', default=None, choices=['numba', 'cython'],
+        help='''Compiled cost function used by the numpy backend only, defaults to numba. 
+        The cython kernel must be built first with: cythonize -i rastrigin_cy.pyx''')
+    parser.add_argument(
+        '--backend', default='numpy', choices=['numpy', 'jax', 'cuda'],
+        help='''Implementation used for the search. Plotting, --constriction, --processes and --kernel 
+        are only supported by the numpy backend.''')
     
     args = parser.parse_args()
+    if args.backend != 'numpy':
+        if args.plot:
+            parser.error('--plot is only supported by the numpy backend')
+        if args.constriction:
+            parser.error('--constriction is only supported by the numpy backend')
+        if args.processes is not None:
+            parser.error('--processes is only supported by the numpy backend')
+        if args.kernel is not None:
+            parser.error('--kernel is only supported by the numpy backend')
 
-    swarm = pso.ParticleSwarm(
-        n_particles = args.particles,
-        cost_function = rastrigin.rastrigin_2d,
-        x_bounds=(-5.12, 5.12),
-        y_bounds=(-5.12, 5.12),
-        random_seed=args.seed,
-        plot=args.plot
-    )
+    if args.backend == 'jax':
+        import pso_jax
+        best_value, best_position = pso_jax.search(
+            n_particles=args.particles,
+            n_iterations=args.iterations,
+            x_bounds=(-5.12, 5.12),
+            y_bounds=(-5.12, 5.12),
+            random_seed=args.seed
+        )
+    elif args.backend == 'cuda':
+        import pso_cuda
+        best_value, best_position = pso_cuda.search(
+            n_particles=args.particles,
+            n_iterations=args.iterations,
+            x_bounds=(-5.12, 5.12),
+            y_bounds=(-5.12, 5.12),
+            random_seed=args.seed
+        )
+    else:
+        if args.kernel == 'cython':
+            import rastrigin_cy
+            batch_cost_function = rastrigin_cy.rastrigin_batch
+        else:
+            batch_cost_function = rastrigin.rastrigin_batch
 
-    swarm.initialize_swarm()
+        with pso.ParticleSwarm(
+            n_particles = args.particles,
+            cost_function = rastrigin.rastrigin_2d,
+            x_bounds=(-5.12, 5.12),
+            y_bounds=(-5.12, 5.12),
+            random_seed=args.seed,
+            plot=args.plot,
+            batch_cost_function=batch_cost_function,
+            n_processes=args.processes,
+            constriction=args.constriction
+        ) as swarm:
+            swarm.initialize_swarm()
 
-    best_value, best_position = swarm.search(args.iterations)
+            best_value, best_position = swarm.search(args.iterations)
     expected_best_value = 0
     expected_best_position = (0, 0)
 
@@ -16,20 +16,25 @@ import numpy as np
 
 FILE_DIR = 'tmp'
 
+# (X, Y, Z) grids from surface_grid, keyed by the function and grid parameters
+_SURFACE_CACHE = {}
 
-def plot_function(
+
+def surface_grid(
         func: typing.Callable[[float, float], float],
         x_range: tuple[float, float],
         y_range: tuple[float, float],
-        tick_distance: float,
-        additional_points: typing.Optional[list] = None,
-        filename: typing.Optional[str] = None
-) -> None:
-    """Plots the provided function as a 3d surface across the provided range
+        tick_distance: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Evaluates the provided function on a grid across the provided range
+
+    Returns the (X, Y, Z) arrays used to draw the surface. Grids are cached, so repeated
+    calls with the same arguments return the same arrays and must not be modified.
     """
-    fig, ax = plt.subplots(subplot_kw={'projection': '3d'})
+    key = (func, tuple(x_range), tuple(y_range), tick_distance)
+    if key in _SURFACE_CACHE:
+        return _SURFACE_CACHE[key]
 
-    # Set up grid
     x_min, x_max = x_range
     y_min, y_max = y_range
     X = np.arange(x_min, x_max, tick_distance)
@@ -38,6 +43,30 @@ def plot_function(
 
     # Get function values in numpy format
     Z = np.array(func(X, Y))
+    _SURFACE_CACHE[key] = X, Y, Z
+    return _SURFACE_CACHE[key]
+
+
+def plot_function(
+        func: typing.Callable[[float, float], float],
+        x_range: tuple[float, float],
+        y_range: tuple[float, float],
+        tick_distance: float,
+        additional_points: typing.Optional[list] = None,
+        filename: typing.Optional[str] = None,
+        surface: typing.Optional[tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+) -> None:
+    """Plots the provided function as a 3d surface across the provided range
+
+    A precomputed (X, Y, Z) grid from `surface_grid` can be passed as `surface` to avoid
+    re-evaluating the function on every call.
+    """
+    fig, ax = plt.subplots(subplot_kw={'projection': '3d'})
+
+    # Set up grid
+    if surface is None:
+        surface = surface_grid(func, x_range, y_range, tick_distance)
+    X, Y, Z = surface
 
     surface = ax.plot_surface(X, Y, Z, cmap=cm.coolwarm, linewidth=0, alpha=0.5)
     ax.zaxis.set_major_locator(LinearLocator(10))
@@ -59,20 +88,63 @@ def plot_function(
     plt.close()
     
 
-def _add_points(ax: plt.Axes, points: list[tuple[float, float, float]]):
+class Plotter:
+    """Plots a fixed surface and a set of points that move across it
+
+    The figure and surface are only drawn once, each call to `update` just moves
+    the points. Frames are rendered in memory so they can be written straight to an animation.
+    """
+    def __init__(self,
+                 surface: tuple[np.ndarray, np.ndarray, np.ndarray],
+                 n_points: int):
+        self.fig, self.ax = plt.subplots(subplot_kw={'projection': '3d'})
+
+        X, Y, Z = surface
+        surface = self.ax.plot_surface(X, Y, Z, cmap=cm.coolwarm, linewidth=0, alpha=0.5)
+        self.ax.zaxis.set_major_locator(LinearLocator(10))
+        self.ax.zaxis.set_major_formatter('{x:.02f}')
+        self.ax.view_init(75, 105)
+
+        # Add a color bar which maps values to colors.
+        self.fig.colorbar(surface, shrink=0.5, aspect=5)
+
+        # Points are hidden until the first update
+        self.scatter = self.ax.scatter(np.zeros(n_points), np.zeros(n_points), np.zeros(n_points),
+                                       c=_point_colours(n_points))
+        self.scatter.set_visible(False)
+
+    def update(self, positions: np.ndarray, z_values: np.ndarray) -> None:
+        """Moves the points to the provided (n_points, 2) positions and (n_points,) heights"""
+        # Copy, as the swarm overwrites its arrays in place on the next step
+        self.scatter._offsets3d = (positions[:, 0].copy(), positions[:, 1].copy(),
+                                   np.array(z_values))
+        self.scatter.set_visible(True)
+
+    def frame(self) -> np.ndarray:
+        """Renders the figure and returns it as an RGBA image array"""
+        self.fig.canvas.draw()
+        # Copy, as the canvas buffer is reused on the next draw
+        return np.array(self.fig.canvas.buffer_rgba())
+
+    def close(self) -> None:
+        """Closes the underlying figure"""
+        plt.close(self.fig)
+
+
+def _point_colours(n_points: int) -> list:
     # Each point should get a unique (and consistent) colour
     colour_map = plt.get_cmap('gist_rainbow')
-    colours=[colour_map(1.0*i/len(points)) for i in range(len(points))]
+    return [colour_map(1.0*i/n_points) for i in range(n_points)]
 
+
+def _add_points(ax: plt.Axes, points: list[tuple[float, float, float]]):
     X, Y, Z = zip(*points)
-    ax.scatter(X, Y, Z, c=colours)
-
-def create_animation():
-    """Creates an animation from all plots"""
-    files = sorted(os.listdir(FILE_DIR))
-    with imageio.get_writer(os.path.join(FILE_DIR, 'out.gif'), 
-                            mode='i', duration=0.2) as writer:
-        for file in files:
-            image = imageio.imread(os.path.join(FILE_DIR, file))
-            writer.append_data(image)
-    writer.close()
+    ax.scatter(X, Y, Z, c=_point_colours(len(points)))
+
+def animation_writer(filename: str = 'out.gif'):
+    """Opens an imageio writer for an animation in the plotting directory"""
+    if not os.path.exists(FILE_DIR):
+        os.makedirs(FILE_DIR)
+
+    # duration is the time per frame in milliseconds
+    return imageio.get_writer(os.path.join(FILE_DIR, filename), mode='I', duration=200)
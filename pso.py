@@ -4,13 +4,47 @@ More information can be found here: https://en.wikipedia.org/wiki/Particle_swarm
 """
 
 import typing
-from dataclasses import dataclass
-import operator
-from numpy import random
+import math
+import multiprocessing
 import numpy as np
+from numba import njit
+import hyperparameters
 import rastrigin
 import plot
 
+# Single precision is plenty for positions within the search bounds, and halves the
+# memory used by the particle state
+DTYPE = np.float32
+
+
+@njit(fastmath=True, cache=True)
+def _move_particles(pos, vel, pbest, gbest, r, inertia, cognitive_coefficient, social_coefficient,
+                    lower_bounds, upper_bounds):
+    """Updates the velocities and positions of all particles in place
+
+    Specialized for 2D: both dimensions are written out explicitly so each particle's update
+    is straight-line code. r has shape (n_particles, 2, 2), holding the cognitive and social
+    random coefficients for each dimension.
+    """
+    lower_x, lower_y = lower_bounds[0], lower_bounds[1]
+    upper_x, upper_y = upper_bounds[0], upper_bounds[1]
+    best_x, best_y = gbest[0], gbest[1]
+    for i in range(pos.shape[0]):
+        x = pos[i, 0]
+        y = pos[i, 1]
+        vel_x = (inertia * vel[i, 0]
+                 + cognitive_coefficient * r[i, 0, 0] * (pbest[i, 0] - x)
+                 + social_coefficient * r[i, 0, 1] * (best_x - x))
+        vel_y = (inertia * vel[i, 1]
+                 + cognitive_coefficient * r[i, 1, 0] * (pbest[i, 1] - y)
+                 + social_coefficient * r[i, 1, 1] * (best_y - y))
+        vel[i, 0] = vel_x
+        vel[i, 1] = vel_y
+
+        # keep it within the bounds
+        pos[i, 0] = min(max(x + vel_x, lower_x), upper_x)
+        pos[i, 1] = min(max(y + vel_y, lower_y), upper_y)
+
 
 class ParticleSwarm:
     """Initializes and manages Swarm"""
@@ -19,130 +53,182 @@ class ParticleSwarm:
                  cost_function: typing.Callable,
                  x_bounds: tuple[float, float],
                  y_bounds: tuple[float, float],
-                 random_seed: typing.Optional[float] = None,
-                 plot: bool = False):
+                 random_seed: typing.Optional[int] = None,
+                 plot: bool = False,
+                 batch_cost_function: typing.Optional[typing.Callable] = None,
+                 n_processes: typing.Optional[int] = None,
+                 constriction: bool = False):
         self.n_particles = n_particles
         self.cost_function = cost_function
+        # Optional batch form of the cost function, called as f(positions, out).
+        # Ignored when n_processes is set, as the pool evaluates cost_function per particle
+        self.batch_cost_function = batch_cost_function
         self.x_bounds = x_bounds
         self.y_bounds = y_bounds
+        # Per-dimension bounds, passed to _move_particles which clamps each coordinate
+        self._lo = np.array([x_bounds[0], y_bounds[0]], dtype=DTYPE)
+        self._hi = np.array([x_bounds[1], y_bounds[1]], dtype=DTYPE)
         self.global_best_z_value = np.inf
         self.global_best_position = (np.inf, np.inf)
         self.plot = plot
-        self._particles = []
+        self.pos = np.empty((n_particles, 2), dtype=DTYPE)
+        self.vel = np.empty((n_particles, 2), dtype=DTYPE)
+        self.pbest = np.empty((n_particles, 2), dtype=DTYPE)
+        self.pbest_z = np.full(n_particles, np.inf, dtype=DTYPE)
+        self._gbest = np.full(2, np.inf, dtype=DTYPE)
+        # Buffers reused every step to avoid allocating in the update
+        self._z = np.empty(n_particles, dtype=DTYPE)
+        self._r = np.empty((n_particles, 2, 2), dtype=DTYPE)
+        self._improved = np.empty(n_particles, dtype=bool)
         self._iteration = 0
+        self._search_start = 0 # iteration at which the current search started
         self._tick_distance = 0.12 # for plotting
+        self._plotter = None
+        self._writer = None
+        # Worker pool for expensive cost functions, evaluated one particle per task.
+        # Created once here, as starting workers every iteration would cost more than it saves.
+        # Shut down by close(), or on leaving a `with` block, along with any plotting
+        self._pool = multiprocessing.Pool(n_processes) if n_processes else None
 
         # hyperparameters
-        # Values set based on Clerc and Kennedy, more info here: 
-        # https://towardsdatascience.com/particle-swarm-optimization-visually-explained-46289eeb2e14
-        self._inertia = 0.8
-        self._cognitive_coefficient = 2.05
-        self._social_coefficient = 2.05
+        self._inertia = hyperparameters.INERTIA
+        self._inertia_start = hyperparameters.INERTIA_START
+        self._inertia_end = hyperparameters.INERTIA_END
+        self._cognitive_coefficient = hyperparameters.COGNITIVE_COEFFICIENT
+        self._social_coefficient = hyperparameters.SOCIAL_COEFFICIENT
+
+        # Clerc's constriction factor, used in place of the inertia schedule when enabled:
+        # vel = chi * (vel + c1 * r_cognitive * (pbest - pos) + c2 * r_social * (gbest - pos))
+        self.constriction = constriction
+        phi = self._cognitive_coefficient + self._social_coefficient
+        self._constriction_factor = 2 / abs(2 - phi - math.sqrt(phi**2 - 4 * phi))
 
 
-        if random_seed is not None:
-            random.seed(random_seed)
+        # Each swarm owns its generator rather than seeding numpy's global state
+        self.rng = np.random.default_rng(random_seed)
 
     def initialize_swarm(self):
         """Initialize all particles and global values"""
-        for _ in range(self.n_particles):
-            position = tuple(random.uniform(*self.x_bounds, 2))
-            velocity = tuple(random.uniform(*self.x_bounds, 2))
-            z_value = self.cost_function(*position)
-
-            self._particles.append(Particle(
-                position=position,
-                velocity=velocity,
-                best_position=position,
-                best_z_value=z_value
-            ))
-            if z_value < self.global_best_z_value:
-                self.global_best_z_value = z_value
-                self.global_best_position = position
-        
-        if self.plot:
-            plot.plot_function(self.cost_function, self.x_bounds, self.y_bounds, 
-                               self._tick_distance, filename='0.png')
+        # Particle state is held as arrays of shape (n_particles, 2), one row per particle
+        self.pos[:] = self.rng.uniform(self._lo, self._hi, size=(self.n_particles, 2))
+        self.vel[:] = self.rng.uniform(self._lo, self._hi, size=(self.n_particles, 2))
+        self.pbest[:] = self.pos
+        self.pbest_z[:] = self._evaluate_swarm()
 
-    def step_all_particles(self):
-        """Step all particles through the next iteration"""
-        # This could be sped up through vectorization
+        self._update_global_best()
         
+        if self.plot:
+            # The bounds never change, so the surface only needs drawing once
+            surface = plot.surface_grid(self.cost_function, self.x_bounds, self.y_bounds,
+                                        self._tick_distance)
+            self._plotter = plot.Plotter(surface, self.n_particles)
+            self._writer = plot.animation_writer()
+            self._writer.append_data(self._plotter.frame())
+
+    def step_all_particles(self, n_iterations: typing.Optional[int] = None):
+        """Step all particles through the next iteration
+
+        Parameters
+        ----------
+        n_iterations : int, optional
+            The total number of iterations in the current search, used for the inertia
+            schedule. If not provided a constant inertia is used.
+        """
         self._iteration += 1
-        bounds = [self.x_bounds, self.y_bounds]
-        for particle in self._particles:
-            new_velocity = [np.inf, np.inf]
-            new_position = [np.inf, np.inf]
-
-            # Determine new velocity (stochastic) and update position accordingly
-            for _dimension in range(2):
-                r_cognitive, r_social = random.uniform(0, 1, 2) 
-                new_velocity[_dimension] = (
-                    (self._inertia * particle.velocity[_dimension])
-                    + (self._cognitive_coefficient * r_cognitive * 
-                       (particle.best_position[_dimension] - particle.position[_dimension]))
-                    + (self._social_coefficient * r_social * 
-                       (self.global_best_position[_dimension] - particle.position[_dimension]))
-                )
-                new_position[_dimension] = particle.position[_dimension] + new_velocity[_dimension]
-                
-                # keep it within the bounds
-                lower_bound, upper_bound = bounds[_dimension]
-                new_position[_dimension] = max(new_position[_dimension], lower_bound)
-                new_position[_dimension] = min(new_position[_dimension], upper_bound)
-                
-
-            particle.position = new_position
-            particle.velocity = new_velocity
-
-            # Update bests for each particle
-
-            z_value = self.cost_function(*particle.position)
-            if z_value < particle.best_z_value:
-                particle.best_z_value = z_value
-                particle.best_position = particle.position
-        
-        # Update global best
-        best_particle = sorted(self._particles, key=lambda x: x.best_z_value)[0]
-        if best_particle.best_z_value < self.global_best_z_value:
-            self.global_best_z_value = best_particle.best_z_value
-            self.global_best_position = best_particle.best_position
-
-        if plot:
-            plot.plot_function(
-                self.cost_function, self.x_bounds, self.y_bounds, self._tick_distance,
-                [[*p.position, self.cost_function(*p.position)] for p in self._particles], f'{self._iteration}.png'
-            )
+        if self.constriction:
+            chi = self._constriction_factor
+            inertia = chi
+            cognitive_coefficient = chi * self._cognitive_coefficient
+            social_coefficient = chi * self._social_coefficient
+        elif n_iterations:
+            # Steps taken in the current search, clamped so inertia stays within [end, start]
+            step = min(max(self._iteration - self._search_start, 0), n_iterations)
+            inertia = hyperparameters.inertia_schedule(step, n_iterations,
+                                                       self._inertia_start, self._inertia_end)
+            cognitive_coefficient = self._cognitive_coefficient
+            social_coefficient = self._social_coefficient
+        else:
+            inertia = self._inertia
+            cognitive_coefficient = self._cognitive_coefficient
+            social_coefficient = self._social_coefficient
+
+        # Determine new velocity (stochastic) and update position accordingly
+        self.rng.random(dtype=DTYPE, out=self._r)
+        _move_particles(self.pos, self.vel, self.pbest, self._gbest, self._r, inertia,
+                        cognitive_coefficient, social_coefficient, self._lo, self._hi)
+
+        # Update bests for each particle
+        z_values = self._evaluate_swarm()
+        np.less(z_values, self.pbest_z, out=self._improved)
+        np.copyto(self.pbest, self.pos, where=self._improved[:, np.newaxis])
+        np.copyto(self.pbest_z, z_values, where=self._improved)
+
+        self._update_global_best()
+
+        if self.plot:
+            # Reuse this step's costs as the heights rather than evaluating the swarm again
+            self._plotter.update(self.pos, z_values)
+            self._writer.append_data(self._plotter.frame())
+
+    def _update_global_best(self):
+        """Update the global best from the particles' personal bests in a single pass"""
+        idx = int(self.pbest_z.argmin())
+        if self.pbest_z[idx] < self.global_best_z_value:
+            self.global_best_z_value = float(self.pbest_z[idx])
+            self._gbest[:] = self.pbest[idx]
+            self.global_best_position = tuple(self._gbest.tolist())
+
+    def _evaluate_swarm(self) -> np.ndarray:
+        """Evaluates the cost function at every particle's position
+
+        Results are written into a preallocated buffer which is overwritten on the next call.
+        """
+        if self._pool is not None:
+            self._z[:] = self._pool.starmap(self.cost_function, self.pos.tolist())
+        elif self.batch_cost_function is not None:
+            self.batch_cost_function(self.pos, self._z)
+        else:
+            self._z[:] = self.cost_function(self.pos[:, 0], self.pos[:, 1])
+        return self._z
 
     def search(self, n_iterations: int):
+        self._search_start = self._iteration
         for _ in range(n_iterations):
-            self.step_all_particles()
-        
-        if self.plot: 
-            plot.create_animation()
+            self.step_all_particles(n_iterations)
 
         return self.global_best_z_value, self.global_best_position
 
+    def close(self):
+        """Finishes the animation and shuts down the worker pool, if any"""
+        if self._plotter is not None:
+            self._plotter.close()
+            self._writer.close()
+            self._plotter = None
+            self._writer = None
+
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
 
-@dataclass
-class Particle:
-    """Holds data pertaining to a particle"""
-    position: tuple[float, float]
-    velocity: tuple[float, float]
-    best_z_value: float
-    best_position: tuple[float, float]
+    def __exit__(self, *exc_info):
+        self.close()
 
 
 if __name__ == '__main__':
     # Development testing
-    ps = ParticleSwarm(
+    with ParticleSwarm(
         n_particles=10,
         cost_function=rastrigin.rastrigin_2d,
         x_bounds=(-5.12, 5.12),
         y_bounds=(-5.12, 5.12),
         random_seed=17,
-        plot=True
-    )
-    ps.initialize_swarm()
-    print(ps.global_best_z_value)
-    print(ps.search(20))
\ No newline at end of file
+        plot=True,
+        batch_cost_function=rastrigin.rastrigin_batch
+    ) as ps:
+        ps.initialize_swarm()
+        print(ps.global_best_z_value)
+        print(ps.search(20))
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Particle Swarm Optimization of the Rastrigin function on a CUDA GPU using Numba
+Each particle is updated by its own thread and all state stays on the device between
+iterations, only the global best is copied back at the end of the search.
+"""
+
+import math
+import typing
+import numpy as np
+from numba import cuda
+from numba.cuda.random import create_xoroshiro128p_states, xoroshiro128p_uniform_float32
+import hyperparameters
+import rastrigin
+
+
+THREADS_PER_BLOCK = 256
+
+# float32 constants so the Rastrigin evaluation stays in single precision on the device
+_A = np.float32(10)
+_TWO_PI = np.float32(2 * math.pi)
+
+
+@cuda.jit(fastmath=True)
+def _pso_step(pos, vel, pbest, pbest_z, gbest, gbest_z, rng_states, w, c1, c2, lo, hi):
+    """Moves one particle per thread, evaluates it and updates the bests"""
+    i = cuda.grid(1)
+    if i >= pos.shape[0]:
+        return
+
+    r_cognitive_x = xoroshiro128p_uniform_float32(rng_states, i)
+    r_cognitive_y = xoroshiro128p_uniform_float32(rng_states, i)
+    r_social_x = xoroshiro128p_uniform_float32(rng_states, i)
+    r_social_y = xoroshiro128p_uniform_float32(rng_states, i)
+
+    x = pos[i, 0]
+    y = pos[i, 1]
+    vel_x = (w * vel[i, 0]
+             + c1 * r_cognitive_x * (pbest[i, 0] - x)
+             + c2 * r_social_x * (gbest[0] - x))
+    vel_y = (w * vel[i, 1]
+             + c1 * r_cognitive_y * (pbest[i, 1] - y)
+             + c2 * r_social_y * (gbest[1] - y))
+
+    # keep it within the bounds
+    x = min(max(x + vel_x, lo[0]), hi[0])
+    y = min(max(y + vel_y, lo[1]), hi[1])
+
+    vel[i, 0] = vel_x
+    vel[i, 1] = vel_y
+    pos[i, 0] = x
+    pos[i, 1] = y
+
+    z = (_A + _A
+         + x * x - _A * math.cos(_TWO_PI * x)
+         + y * y - _A * math.cos(_TWO_PI * y))
+    if z < pbest_z[i]:
+        pbest_z[i] = z
+        pbest[i, 0] = x
+        pbest[i, 1] = y
+        cuda.atomic.min(gbest_z, 0, z)
+
+
+@cuda.jit
+def _select_global_best(pbest_z, gbest_z, gbest_idx):
+    """Finds the lowest index of a particle holding the global best value"""
+    i = cuda.grid(1)
+    if i < pbest_z.shape[0] and pbest_z[i] == gbest_z[0]:
+        cuda.atomic.min(gbest_idx, 0, i)
+
+
+@cuda.jit
+def _copy_global_best(pbest, gbest_idx, gbest):
+    """Copies the selected particle's best position into the global best (single thread)"""
+    idx = gbest_idx[0]
+    if idx < pbest.shape[0]:
+        gbest[0] = pbest[idx, 0]
+        gbest[1] = pbest[idx, 1]
+    gbest_idx[0] = pbest.shape[0]
+
+
+def search(n_particles: int,
+           n_iterations: int,
+           x_bounds: tuple[float, float],
+           y_bounds: tuple[float, float],
+           random_seed: typing.Optional[int] = None) -> tuple[float, tuple[float, float]]:
+    """Searches for the minimum of the Rastrigin function on the GPU
+
+    Returns the best value found and its position, like `ParticleSwarm.search`
+    """
+    rng = np.random.default_rng(random_seed)
+    lower_bounds = np.array([x_bounds[0], y_bounds[0]], dtype=np.float32)
+    upper_bounds = np.array([x_bounds[1], y_bounds[1]], dtype=np.float32)
+
+    # Initialize on the host, then keep everything on the device
+    pos = rng.uniform(lower_bounds, upper_bounds, size=(n_particles, 2)).astype(np.float32)
+    vel = rng.uniform(lower_bounds, upper_bounds, size=(n_particles, 2)).astype(np.float32)
+    pbest_z = rastrigin.rastrigin_2d(pos[:, 0], pos[:, 1]).astype(np.float32)
+    idx = int(pbest_z.argmin())
+
+    d_pos = cuda.to_device(pos)
+    d_vel = cuda.to_device(vel)
+    d_pbest = cuda.to_device(pos)
+    d_pbest_z = cuda.to_device(pbest_z)
+    d_gbest = cuda.to_device(pos[idx].copy())
+    d_gbest_z = cuda.to_device(pbest_z[idx:idx + 1].copy())
+    d_gbest_idx = cuda.to_device(np.array([n_particles], dtype=np.int64))
+    d_lo = cuda.to_device(lower_bounds)
+    d_hi = cuda.to_device(upper_bounds)
+    rng_states = create_xoroshiro128p_states(n_particles, seed=int(rng.integers(2**63)))
+
+    blocks = n_particles // THREADS_PER_BLOCK + 1
+    steps = np.arange(1, n_iterations + 1)
+    inertias = hyperparameters.inertia_schedule(steps, n_iterations)
+    for inertia in inertias:
+        _pso_step[blocks, THREADS_PER_BLOCK](
+            d_pos, d_vel, d_pbest, d_pbest_z, d_gbest, d_gbest_z, rng_states,
+            np.float32(inertia), np.float32(hyperparameters.COGNITIVE_COEFFICIENT),
+            np.float32(hyperparameters.SOCIAL_COEFFICIENT), d_lo, d_hi
+        )
+        _select_global_best[blocks, THREADS_PER_BLOCK](d_pbest_z, d_gbest_z, d_gbest_idx)
+        _copy_global_best[1, 1](d_pbest, d_gbest_idx, d_gbest)
+
+    return float(d_gbest_z.copy_to_host()[0]), tuple(d_gbest.copy_to_host().tolist())
+
+
+if __name__ == '__main__':
+    # Development testing
+    print(search(10, 20, (-5.12, 5.12), (-5.12, 5.12), random_seed=17))
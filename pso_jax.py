@@ -0,0 +1,109 @@
+"""
+Particle Swarm Optimization of the Rastrigin function using JAX
+The full search (initialization and every iteration) compiles to a single XLA program,
+so it runs without any Python overhead per step on either CPU or GPU.
+"""
+
+import functools
+import typing
+import numpy as np
+import jax
+import jax.numpy as jnp
+import hyperparameters
+
+
+class SwarmState(typing.NamedTuple):
+    """Holds the state of the swarm
+
+    pos, vel and pbest have shape (n_particles, 2), pbest_z has shape (n_particles,),
+    gbest has shape (2,) and gbest_z is a scalar.
+    """
+    pos: jax.Array
+    vel: jax.Array
+    pbest: jax.Array
+    pbest_z: jax.Array
+    gbest: jax.Array
+    gbest_z: jax.Array
+
+
+def rastrigin_jax(pos: jax.Array, a: int = 10) -> jax.Array:
+    """Evaluates the 2D Rastigin function for positions of shape (n_particles, 2)"""
+    return a * 2 + jnp.sum(pos * pos - a * jnp.cos(2 * jnp.pi * pos), axis=-1)
+
+
+def _initialize_swarm(key: jax.Array, n_particles: int,
+                      lower_bounds: jax.Array, upper_bounds: jax.Array) -> SwarmState:
+    k_pos, k_vel = jax.random.split(key)
+    pos = jax.random.uniform(k_pos, (n_particles, 2), minval=lower_bounds, maxval=upper_bounds)
+    vel = jax.random.uniform(k_vel, (n_particles, 2), minval=lower_bounds, maxval=upper_bounds)
+    z = rastrigin_jax(pos)
+    idx = jnp.argmin(z)
+    return SwarmState(pos, vel, pos, z, pos[idx], z[idx])
+
+
+def _step(state: SwarmState, key: jax.Array, inertia: jax.Array,
+          lower_bounds: jax.Array, upper_bounds: jax.Array) -> SwarmState:
+    n_particles = state.pos.shape[0]
+    k_cognitive, k_social = jax.random.split(key)
+    r_cognitive = jax.random.uniform(k_cognitive, (n_particles, 2))
+    r_social = jax.random.uniform(k_social, (n_particles, 2))
+
+    vel = (
+        (inertia * state.vel)
+        + (hyperparameters.COGNITIVE_COEFFICIENT * r_cognitive * (state.pbest - state.pos))
+        + (hyperparameters.SOCIAL_COEFFICIENT * r_social * (state.gbest - state.pos))
+    )
+    pos = jnp.clip(state.pos + vel, lower_bounds, upper_bounds)
+
+    # Update bests for each particle
+    z = rastrigin_jax(pos)
+    improved = z < state.pbest_z
+    pbest = jnp.where(improved[:, None], pos, state.pbest)
+    pbest_z = jnp.where(improved, z, state.pbest_z)
+
+    # Update global best
+    idx = jnp.argmin(pbest_z)
+    improved_global = pbest_z[idx] < state.gbest_z
+    gbest = jnp.where(improved_global, pbest[idx], state.gbest)
+    gbest_z = jnp.where(improved_global, pbest_z[idx], state.gbest_z)
+
+    return SwarmState(pos, vel, pbest, pbest_z, gbest, gbest_z)
+
+
+@functools.partial(jax.jit, static_argnames=('n_particles', 'n_iterations'))
+def _search(key: jax.Array, n_particles: int, n_iterations: int,
+            lower_bounds: jax.Array, upper_bounds: jax.Array) -> SwarmState:
+    key, init_key = jax.random.split(key)
+    state = _initialize_swarm(init_key, n_particles, lower_bounds, upper_bounds)
+
+    def body(state, step_inputs):
+        step_key, inertia = step_inputs
+        return _step(state, step_key, inertia, lower_bounds, upper_bounds), None
+
+    steps = np.arange(1, n_iterations + 1)
+    inertias = jnp.asarray(hyperparameters.inertia_schedule(steps, n_iterations),
+                           dtype=jnp.float32)
+    state, _ = jax.lax.scan(body, state, (jax.random.split(key, n_iterations), inertias))
+    return state
+
+
+def search(n_particles: int,
+           n_iterations: int,
+           x_bounds: tuple[float, float],
+           y_bounds: tuple[float, float],
+           random_seed: typing.Optional[int] = None) -> tuple[float, tuple[float, float]]:
+    """Searches for the minimum of the Rastrigin function
+
+    Returns the best value found and its position, like `ParticleSwarm.search`
+    """
+    seed = np.random.SeedSequence(random_seed).generate_state(1)[0]
+    state = _search(
+        jax.random.PRNGKey(seed), n_particles, n_iterations,
+        jnp.array([x_bounds[0], y_bounds[0]]), jnp.array([x_bounds[1], y_bounds[1]])
+    )
+    return float(state.gbest_z), tuple(np.asarray(state.gbest).tolist())
+
+
+if __name__ == '__main__':
+    # Development testing
+    print(search(10, 20, (-5.12, 5.12), (-5.12, 5.12), random_seed=17))
@@ -9,22 +9,24 @@ import math
 import plot
 import numpy.typing as npt
 import numpy as np
+from numba import njit
 
 
-@np.vectorize
 def rastrigin_2d(x: Union[float, npt.NDArray], y: Union[float, npt.NDArray], a: int = 10
                  ) -> Union[float, npt.NDArray]:
     """Rastigin function for testing optimization algorithms
 
     Rastigin is a non-convex, multimodal function perfect for testing optimization algorithms 
     in regards to local minima. This function only supports the 2D version of Rastigin.
+    Inputs are broadcast against each other, so a whole swarm or plotting grid is evaluated
+    in a single call.
 
     Parameters
     ----------
-    x : float
-        The X value, must be in [-5.12, 5.12]
-    y : float
-        The y value, must be in [-5.12, 5.12]
+    x : float or array
+        The X value(s), must be in [-5.12, 5.12]
+    y : float or array
+        The y value(s), must be in [-5.12, 5.12]
     a : int, optional
         The A parameter is a constant that modifies the Rastigin function.
 
@@ -37,6 +39,24 @@ def rastrigin_2d(x: Union[float, npt.NDArray], y: Union[float, npt.NDArray], a:
     AssertionError
         An assertion error is raised if (x,y) fall outside of the bounds of the function
 
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+
+    # Function restrictions
+    assert np.all((-5.12 <= x) & (x <= 5.12))
+    assert np.all((-5.12 <= y) & (y <= 5.12))
+
+    return (a * 2
+            + (x * x - a * np.cos(2 * np.pi * x))
+            + (y * y - a * np.cos(2 * np.pi * y)))
+
+
+def rastrigin_scalar(x: float, y: float, a: int = 10) -> float:
+    """Scalar reference implementation of the 2D Rastigin function
+
+    See `rastrigin_2d` for details, this version only accepts single floats and is kept
+    as a reference for checking the vectorized implementations.
     """
     # Function restrictions
     assert -5.12 <= x <= 5.12
@@ -46,6 +66,28 @@ def rastrigin_2d(x: Union[float, npt.NDArray], y: Union[float, npt.NDArray], a:
     return a * 2 + _sum
 
 
+@njit(fastmath=True, cache=True)
+def rastrigin_batch(pos: npt.NDArray, out: npt.NDArray) -> None:
+    """Evaluates the 2D Rastigin function (with A=10) for a whole swarm at once
+
+    Compiled with Numba so the cost of every particle is computed in one fused loop
+    without allocating temporary arrays. No bounds checking is done.
+
+    Parameters
+    ----------
+    pos : array
+        Positions of shape (n_particles, 2)
+    out : array
+        Array of shape (n_particles,) that the results are written into
+    """
+    for i in range(pos.shape[0]):
+        x = pos[i, 0]
+        y = pos[i, 1]
+        out[i] = (20.0
+                  + x * x - 10 * math.cos(2 * math.pi * x)
+                  + y * y - 10 * math.cos(2 * math.pi * y))
+
+
 def almost_equals(a: float, b: float, epsilon: float = 0.01) -> bool:
     """ Basic float equality function
     """
@@ -56,6 +98,12 @@ if __name__ == "__main__":
     # Development testing
     assert almost_equals(rastrigin_2d(0, 0), 0)
     assert almost_equals(rastrigin_2d(0.5, 1), 21.25)
+    assert almost_equals(rastrigin_scalar(0, 0), 0)
+    assert almost_equals(rastrigin_scalar(0.5, 1), 21.25)
+    assert np.allclose(rastrigin_2d(np.array([0, 0.5]), np.array([0, 1])), [0, 21.25])
+    _out = np.empty(2)
+    rastrigin_batch(np.array([[0, 0], [0.5, 1]]), _out)
+    assert np.allclose(_out, [0, 21.25])
     try:
         rastrigin_2d(-5.13, 0)
     except AssertionError:
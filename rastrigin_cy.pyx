@@ -0,0 +1,27 @@
+# cython: language_level=3
+"""
+Cython version of the batched Rastrigin function, for use where Numba is unavailable
+Build in place with: cythonize -i rastrigin_cy.pyx
+"""
+
+cimport cython
+from cython cimport floating
+from libc.math cimport cos, M_PI
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef void rastrigin_batch(floating[:, :] pos, floating[:] out) noexcept nogil:
+    """Evaluates the 2D Rastigin function (with A=10) for a whole swarm at once
+
+    Same interface as `rastrigin.rastrigin_batch`: positions of shape (n_particles, 2) are
+    evaluated into `out` of shape (n_particles,). No bounds checking is done.
+    """
+    cdef Py_ssize_t i
+    cdef double x, y
+    for i in range(pos.shape[0]):
+        x = pos[i, 0]
+        y = pos[i, 1]
+        out[i] = (20.0
+                  + x * x - 10 * cos(2 * M_PI * x)
+                  + y * y - 10 * cos(2 * M_PI * y))